@@ -1,6 +1,124 @@
 import re
+import sys
+import bisect
+from array import array
 from PySide6 import QtWidgets, QtCore, QtGui
 
+# Line kinds, computed once per line and stored in a bytearray parallel to the text snapshot.
+KIND_OTHER = 0
+KIND_HUNK = 1        # '@@ ...'
+KIND_ADD = 2         # '+...' (not '+++')
+KIND_DEL = 3         # '-...' (not '---')
+KIND_CTX_BLANK = 4   # ' ' followed by whitespace only
+KIND_CTX = 5         # ' ' followed by content
+KIND_NEW_FILE = 6    # '+++ path'
+KIND_OLD_FILE = 7    # '---...' (treated like OTHER by the chunker)
+
+# Matches hunk/file header kinds; run over the kinds bytearray so header lookups happen in C.
+_HEADER_RE = re.compile(b'[%c%c]' % (KIND_HUNK, KIND_NEW_FILE))
+# Inside a hunk, the next line that matters: a header or the first line of a '-'/'+' run.
+_HUNK_EVENT_RE = re.compile(b'[%c%c%c%c]' % (KIND_HUNK, KIND_NEW_FILE, KIND_DEL, KIND_ADD))
+# A chunk's data lines: a (possibly empty) '-' run followed by a (possibly empty) '+' run.
+_DATA_RUN_RE = re.compile(b'%c*%c*' % (KIND_DEL, KIND_ADD))
+_HUNK_KIND = bytes([KIND_HUNK])
+_NEW_FILE_KIND = bytes([KIND_NEW_FILE])
+
+
+def _parse_filepath_from_header(text: str) -> str:
+    # The path is the second whitespace-separated token; some tools append extra tokens
+    # after it (tabs, timestamps, annotations), and a stray CR is split off as whitespace.
+    parts = text.split(None, 2)
+    if len(parts) < 2:
+        return ""
+    path_part = parts[1]
+    # Strip diff prefixes a/ or b/
+    if path_part.startswith(('a/', 'b/')):
+        path_part = path_part[2:]
+    # Normalize separators (we prefer forward slashes; we'll join with pathlib later).
+    # Interned so every chunk of a file shares one string object.
+    return sys.intern(path_part.replace('\\', '/'))
+
+
+def _classify(text: str) -> int:
+    # Dispatch on the first character; nearly every diff line is resolved by one compare.
+    c = text[:1]
+    if c == ' ':
+        return KIND_CTX if text[1:].strip() else KIND_CTX_BLANK
+    if c == '+':
+        if text[1:3] == '++':
+            return KIND_NEW_FILE if text[3:4] == ' ' else KIND_OTHER
+        return KIND_ADD
+    if c == '-':
+        return KIND_OLD_FILE if text[1:3] == '--' else KIND_DEL
+    if c == '@' and text[1:2] == '@':
+        return KIND_HUNK
+    return KIND_OTHER
+
+
+def _qt_len(text: str) -> int:
+    """Length of text in QTextDocument positions (UTF-16 code units)."""
+    if text.isascii():
+        return len(text)
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _scan_kinds(kinds: bytearray, start: int, stop: int, context_before: int):
+    """
+    Chunk state machine over lines [start, stop) of a kinds buffer. Pure integer work, no text or Qt.
+    Returns (chunks, file_header_lines) with chunks as (chunk_start, first_data_line, chunk_end).
+    """
+    chunks = []
+    file_header_lines = []
+    in_hunk = False
+
+    i = start
+    while i < stop:
+        # Skip to the next line that can change state: a header, or (inside a hunk) a '-'/'+' line.
+        m = (_HUNK_EVENT_RE if in_hunk else _HEADER_RE).search(kinds, i, stop)
+        if m is None:
+            break
+        i = m.start()
+        k = kinds[i]
+
+        if k == KIND_NEW_FILE:
+            file_header_lines.append(i)
+            in_hunk = False
+            i += 1
+            continue
+
+        if k == KIND_HUNK:
+            in_hunk = True
+            i += 1
+            continue
+
+        # Optional '-' run, then optional '+' run; a lone '-' run is a pure deletion chunk.
+        e = _DATA_RUN_RE.match(kinds, i, stop).end()
+
+        # Up to context_before preceding non-blank context lines; blank ones in between ride along.
+        chunk_start = i
+        found = 0
+        n = i - 1
+        while n >= 0 and found < context_before:
+            c = kinds[n]
+            if c == KIND_CTX:
+                chunk_start = n
+                found += 1
+            elif c != KIND_CTX_BLANK:
+                break
+            n -= 1
+
+        chunks.append((chunk_start, i, e - 1))
+        i = e
+
+    return chunks, file_header_lines
+
+
+def _splice_column(col: array, k0: int, k1: int, new: array, delta: int):
+    """Replace col[k0:k1] with new, shifting the entries after k1 by delta."""
+    if delta:
+        col[k1:] = array(col.typecode, [v + delta for v in col[k1:]])
+    col[k0:k1] = new
+
 
 class ChunkedPlainTextEdit(QtWidgets.QPlainTextEdit):
     """
@@ -12,9 +130,10 @@ class ChunkedPlainTextEdit(QtWidgets.QPlainTextEdit):
       - Include up to N (1..3) preceding non-blank context lines.
 
     Behavior:
-      - Assigns a chunk index to every block in a chunk (block.userState = chunk_idx, 0-based).
+      - Keeps sorted chunk start/end block numbers; the chunk under the mouse is found by bisecting them.
       - On hover: shows "Chunk #n", highlights the chunk, and emits a `chunkHovered` signal
-        with the chunk's file path and its context lines for fuzzy matching.
+        with the chunk's file path and its context lines for fuzzy matching. Emissions are coalesced
+        to the latest chunk per event-loop turn (see set_hover_emission_interval).
       - Context menu: "Apply Chunk #n" emits chunkApplyRequested.
       - get_chunk_details(idx): returns details needed to apply a chunk.
     """
@@ -39,15 +158,28 @@ class ChunkedPlainTextEdit(QtWidgets.QPlainTextEdit):
         self._debug = bool(debug)
 
         self._chunk_count = 0
-        self._chunk_block_spans = []   # list[(bn_start, bn_end)]
-        self._chunk_pos_spans = []     # list[(start_pos, end_pos_excl)]
-        self._chunk_file_paths = []    # per-chunk file path
-        self._chunk_context_info = []  # list[(context_lines, first_context_block)]
+        # Per-chunk numeric columns (sorted, since chunks never overlap)
+        self._chunk_starts = array('i')      # first block number
+        self._chunk_ends = array('i')        # last block number
+        self._chunk_cursors = []       # per-chunk QTextCursor selecting the chunk (tracks later edits)
+        self._chunk_file_idx = array('i')  # per-chunk index into _filepaths
+        self._filepaths = []           # distinct file paths seen since the last full recompute
+        self._filepath_index = {}      # file path -> index in _filepaths
+        self._filepaths_limit = 0      # compact _filepaths once it grows past this many entries
+        self._chunk_n_context = array('i')  # per-chunk number of leading context lines
+        self._file_header_bns = []     # sorted block numbers of '+++' headers
+        self._lines = []               # snapshot of block texts as of the last (re)scan
+        self._kinds = bytearray()      # KIND_* per snapshot line
         self._last_hover_chunk = None
-
+        self._last_emitted_hover = None  # (chunk_index, file_path) last sent via chunkHovered
+        self._hover_chunk = None  # index of the chunk painted with the hover overlay, or None
+        self._pending_hover = -1  # latest chunk index waiting to be sent via chunkHovered
+        self._hover_row = None  # (top, bottom, scroll, revision, width) of the block last resolved under the mouse
+        self._reset_pending()
+
+        # Hover highlight: yellow, multiplied over the painted text so glyphs stay legible
+        self._hover_color = QtGui.QColor(255, 255, 175)
         # Formats:
-        # - Hover highlight: yellow
-        self._fmt_hover_yellow = self._make_bg_format(QtGui.QColor(255, 255, 128, 160))
         # - Base colors by applicability state (persist on the chunk)
         self._fmt_state_applicable = self._make_bg_format(QtGui.QColor(128, 255, 170, 140))   # green
         self._fmt_state_not_applicable = self._make_bg_format(QtGui.QColor(255, 128, 128, 140))  # red
@@ -60,12 +192,17 @@ class ChunkedPlainTextEdit(QtWidgets.QPlainTextEdit):
         # Apply any base selections by default
         self.setExtraSelections(self._base_selections)
 
-        self.document().contentsChanged.connect(self._recompute_chunks)
+        # chunkHovered is sent from a timer so a fast sweep across chunks reaches receivers as one emission
+        self._hover_emit_timer = QtCore.QTimer(self)
+        self._hover_emit_timer.setSingleShot(True)
+        self._hover_emit_timer.setInterval(0)
+        self._hover_emit_timer.timeout.connect(self._send_pending_hover)
+
+        self.document().contentsChange.connect(self._on_contents_change)
         self._recompute_chunks()
 
     def set_debug(self, on: bool):
         self._debug = bool(on)
-        self._recompute_chunks()
 
     def _make_bg_format(self, color: QtGui.QColor) -> QtGui.QTextCharFormat:
         fmt = QtGui.QTextCharFormat()
@@ -78,211 +215,337 @@ class ChunkedPlainTextEdit(QtWidgets.QPlainTextEdit):
             yield b
             b = b.next()
 
-    @staticmethod
-    def _is_new_file_header(text: str) -> bool:
-        return text.startswith('+++ ')
-
-    @staticmethod
-    def _parse_filepath_from_header(text: str) -> str:
-        # Some tools can append extra tokens after the path (tabs, annotations).
-        parts = text.split(maxsplit=1)
-        if len(parts) < 2:
-            return ""
-        path_part = parts[1].strip()
-        # Keep only the first "token" if extras are present after whitespace or tabs.
-        path_part = path_part.split()[0]
-        # Strip diff prefixes a/ or b/
-        if path_part.startswith('a/') or path_part.startswith('b/'):
-            path_part = path_part[2:]
-        # Normalize separators (we prefer forward slashes; we'll join with pathlib later)
-        path_part = path_part.replace('\\', '/')
-        # Final trim (in case of stray CR)
-        return path_part.strip()
-
-    @staticmethod
-    def _is_hunk_header(text: str) -> bool:
-        return text.startswith('@@')
-
-    @staticmethod
-    def _is_add(text: str) -> bool:
-        return text.startswith('+') and not text.startswith('+++')
-
-    @staticmethod
-    def _is_del(text: str) -> bool:
-        return text.startswith('-') and not text.startswith('---')
-
-    @staticmethod
-    def _is_ctx(text: str) -> bool:
-        return text.startswith(' ')
-
-    @staticmethod
-    def _ctx_has_content(text: str) -> bool:
-        return text.startswith(' ') and len(text[1:].strip()) > 0
-
-    def _collect_preceding_context_blocks(self, first_data_block: QtGui.QTextBlock, limit: int):
-        out = []
-        b = first_data_block.previous()
-        while b.isValid() and len(out) < limit:
-            t = b.text()
-            if self._is_hunk_header(t):
-                break
-            if self._is_ctx(t):
-                if self._ctx_has_content(t):
-                    out.insert(0, b)
-                b = b.previous()
-            else:
-                break
-        return out
+    def _file_index(self, path: str) -> int:
+        fi = self._filepath_index.get(path)
+        if fi is None:
+            fi = self._filepath_index[path] = len(self._filepaths)
+            self._filepaths.append(path)
+        return fi
+
+    def _compact_filepaths(self):
+        """Drop file paths no chunk refers to any more (e.g. each prefix of a header path being typed)."""
+        used = sorted(set(self._chunk_file_idx))
+        remap = {old: new for new, old in enumerate(used)}
+        self._filepaths = [self._filepaths[i] for i in used]
+        self._filepath_index = {path: i for i, path in enumerate(self._filepaths)}
+        self._chunk_file_idx = array('i', map(remap.__getitem__, self._chunk_file_idx))
+        self._filepaths_limit = 2 * len(self._filepaths) + 64
+
+    def _scan_region(self, start: int, stop: int, current_filepath: str):
+        """
+        Scan snapshot lines [start, stop).
+        Returns (starts, ends, file_indices, context_counts, file_header_lines) for the chunks found.
+        """
+        lines = self._lines
+        chunks, file_header_lines = _scan_kinds(self._kinds, start, stop, self._context_before)
+        starts = array('i')
+        ends = array('i')
+        file_indices = array('i')
+        fi = self._file_index(current_filepath)
+        context_counts = array('i')
+        h = 0
+        for chunk_start, first_data_line, chunk_end in chunks:
+            while h < len(file_header_lines) and file_header_lines[h] < first_data_line:
+                fi = self._file_index(_parse_filepath_from_header(lines[file_header_lines[h]]))
+                h += 1
+            starts.append(chunk_start)
+            ends.append(chunk_end)
+            file_indices.append(fi)
+            # Every line before the first '-'/'+' line of the chunk is a context line.
+            context_counts.append(first_data_line - chunk_start)
+        return starts, ends, file_indices, context_counts, file_header_lines
+
+    def _positions(self, starts, ends, start: int, base_pos: int):
+        """Document positions of chunk line spans within a region starting at line `start` (position base_pos)."""
+        lines = self._lines
+        stop = ends[-1] + 1 if ends else start
+        offsets = [base_pos]
+        for t in lines[start:stop]:
+            offsets.append(offsets[-1] + _qt_len(t) + 1)
+        pos_starts = array('i', [offsets[s - start] for s in starts])
+        pos_ends = array('i', [offsets[e - start] + _qt_len(lines[e]) for e in ends])
+        return pos_starts, pos_ends
+
+    def _snapshot_lines(self) -> list[str]:
+        doc = self.document()
+        lines = doc.toRawText().split('\u2029')
+        if len(lines) != doc.blockCount():
+            lines = [b.text() for b in self._for_each_block()]
+        return lines
 
     def _recompute_chunks(self):
+        self._reset_pending()
         doc = self.document()
-        for b in self._for_each_block():
-            b.setUserState(-1)
+        if doc.isEmpty():
+            self._clear_chunks()
+            return
+        self._lines = self._snapshot_lines()
+        self._kinds = bytearray(map(_classify, self._lines))
+        self._filepaths.clear()
+        self._filepath_index.clear()
+        starts, ends, file_indices, context_counts, file_header_lines = self._scan_region(0, len(self._lines), "")
+        self._chunk_starts = starts
+        self._chunk_ends = ends
+        self._chunk_file_idx = file_indices
+        self._chunk_n_context = context_counts
+        self._file_header_bns[:] = file_header_lines
+        self._chunk_cursors[:] = map(self._make_chunk_cursor, *self._positions(starts, ends, 0, 0))
+        self._finish_recompute()
+
+    def _clear_chunks(self):
+        """Fast path for an empty document: one empty line and no chunks."""
+        self._lines = [""]
+        self._kinds = bytearray([KIND_OTHER])
+        self._file_header_bns.clear()
+        self._filepaths.clear()
+        self._filepath_index.clear()
+        if not self._chunk_count:
+            return
+        self._chunk_starts = array('i')
+        self._chunk_ends = array('i')
+        self._chunk_cursors.clear()
+        self._chunk_file_idx = array('i')
+        self._chunk_n_context = array('i')
+        self._finish_recompute()
+
+    def _finish_recompute(self, replaced=None):
+        """
+        replaced: (k0, k1, n_new) when old chunks [k0, k1) were replaced by n_new re-scanned chunks,
+        or None after a full recompute.
+        """
+        if replaced is None:
+            # Chunk indices start over: reset statuses and the hovered chunk
+            self._chunk_status.clear()
+            self._forget_hovered_chunk()
+            self._filepaths_limit = 2 * len(self._filepaths) + 64
+        else:
+            # Keep statuses of untouched chunks, renumbering the ones after the re-scanned region
+            k0, k1, n_new = replaced
+            shift = n_new - (k1 - k0)
+            if self._chunk_status:
+                self._chunk_status = {
+                    (idx if idx < k0 else idx + shift): status
+                    for idx, status in self._chunk_status.items()
+                    if not k0 <= idx < k1
+                }
+            # Same for the hovered chunk; if it was re-scanned, the next mouse move resolves it afresh
+            hovered = (self._hover_chunk, self._last_hover_chunk)
+            if any(idx is not None and k0 <= idx < k1 for idx in hovered):
+                self._forget_hovered_chunk()
+            elif shift:
+                self._hover_chunk, self._last_hover_chunk = (
+                    idx + shift if idx is not None and idx >= k1 else idx for idx in hovered
+                )
+            # Re-scanned headers add new paths; the ones they replaced stay until compacted
+            if len(self._filepaths) > self._filepaths_limit:
+                self._compact_filepaths()
+        if self._base_selections or self._chunk_status:
+            self._rebuild_base_selections()
+            self.setExtraSelections(list(self._base_selections))
+        self._chunk_count = len(self._chunk_starts)
+        self.chunks_recomputed.emit(self._chunk_count)
 
-        self._chunk_block_spans.clear()
-        self._chunk_pos_spans.clear()
-        self._chunk_file_paths.clear()
-        self._chunk_context_info.clear()
+    def _region_start_line(self, i: int) -> int:
+        """Nearest hunk/file header at or before line i, or the first line."""
+        kinds = self._kinds
+        return max(kinds.rfind(_HUNK_KIND, 0, i + 1), kinds.rfind(_NEW_FILE_KIND, 0, i + 1), 0)
 
-        # Reset statuses and base selections on recompute
-        self._chunk_status.clear()
-        self._base_selections.clear()
-        current_filepath = ""
-        in_hunk = False
+    def _on_contents_change(self, position: int, chars_removed: int, chars_added: int):
+        """
+        Incremental rechunking. Chunks never span a hunk or file header, so only the region between
+        the headers surrounding the edit is re-scanned; chunks outside it are kept and shifted.
 
-        b = doc.firstBlock()
-        while b.isValid():
-            t = b.text()
+        The line snapshot is updated right away, but the re-scan is deferred to the next event-loop
+        turn so a burst of edits (typing, streamed paste) is chunked once.
+        """
+        if self._pending_full:
+            return
+        doc = self.document()
+        if doc.isEmpty():
+            # Cleared (e.g. select-all + delete): skip splicing and shifting, just reset.
+            self._schedule_recompute(full=True)
+            return
+        block_delta = doc.blockCount() - len(self._lines)
+
+        first = doc.findBlock(position)
+        last = doc.findBlock(position + chars_added)
+        if not last.isValid():
+            last = doc.lastBlock()
+        if not first.isValid() or last.blockNumber() < first.blockNumber():
+            self._schedule_recompute(full=True)
+            return
+        bn_first = first.blockNumber()
+        bn_last = last.blockNumber()
+        old_last = bn_last - block_delta  # number of the last changed line before the edit
+        if old_last < bn_first:
+            self._schedule_recompute(full=True)
+            return
 
-            if self._is_new_file_header(t):
-                current_filepath = self._parse_filepath_from_header(t)
-                in_hunk = False
-                b = b.next()
-                continue
+        # Splice the changed blocks into the line snapshot.
+        changed = []
+        b = first
+        while b.isValid() and b.blockNumber() <= bn_last:
+            changed.append(b.text())
+            b = b.next()
+        changed_kinds = bytearray(map(_classify, changed))
+        self._lines[bn_first:old_last + 1] = changed
+        self._kinds[bn_first:old_last + 1] = changed_kinds
+
+        # Keep the sorted list of '+++' header lines in sync. If one was added or removed,
+        # the file path of every chunk up to the next file header may have changed.
+        new_headers = [bn_first + n for n, k in enumerate(changed_kinds) if k == KIND_NEW_FILE]
+        hdrs = self._file_header_bns
+        lo = bisect.bisect_left(hdrs, bn_first)
+        hi = bisect.bisect_right(hdrs, old_last)
+        self._pending_path_dirty |= bool(new_headers) or hi > lo
+        hdrs[lo:hi] = new_headers
+        for i in range(lo + len(new_headers), len(hdrs)):
+            hdrs[i] += block_delta
+
+        # Merge with lines already awaiting a re-scan (their numbering shifts with this edit).
+        if self._pending_lines is not None:
+            p_first, p_last = self._pending_lines
+            bn_first = min(bn_first, p_first)
+            bn_last = max(old_last, p_last) + block_delta
+        self._pending_lines = (bn_first, bn_last)
+        self._pending_block_delta += block_delta
+        self._schedule_recompute()
+
+    def _schedule_recompute(self, full: bool = False):
+        self._pending_full |= full
+        if not self._recompute_pending:
+            self._recompute_pending = True
+            QtCore.QTimer.singleShot(0, self._do_recompute)
+
+    def _do_recompute(self):
+        if not self._recompute_pending:
+            return
+        if self._pending_full:
+            self._recompute_chunks()
+        else:
+            self._rescan_pending()
 
-            if self._is_hunk_header(t):
-                in_hunk = True
-                b = b.next()
-                continue
+    def _flush_recompute(self):
+        """Run a pending re-scan now, so chunk indices and spans match the current text."""
+        if self._recompute_pending:
+            self._do_recompute()
 
-            if not in_hunk:
-                b = b.next()
-                continue
+    def _reset_pending(self):
+        self._recompute_pending = False
+        self._pending_full = False
+        self._pending_lines = None      # (first, last) changed lines in current numbering
+        self._pending_block_delta = 0   # line count change since chunk spans were computed
+        self._pending_path_dirty = False
 
-            if self._is_del(t) or self._is_add(t):
-                start_search_block = b
-                minus_start, minus_end = None, None
-                cur = start_search_block
-                while cur.isValid() and self._is_del(cur.text()):
-                    if minus_start is None:
-                        minus_start = cur
-                    minus_end = cur
-                    cur = cur.next()
-
-                plus_start_block = cur if minus_start is not None else start_search_block
-                if plus_start_block.isValid() and self._is_add(plus_start_block.text()):
-                    plus_start, plus_end = plus_start_block, plus_start_block
-                    curp = plus_start_block.next()
-                    while curp.isValid() and self._is_add(curp.text()):
-                        plus_end = curp
-                        curp = curp.next()
-
-                    first_data_block = minus_start if minus_start is not None else plus_start
-                    context_blocks = self._collect_preceding_context_blocks(first_data_block, self._context_before)
-                    chunk_start_block = context_blocks[0] if context_blocks else first_data_block
-                    chunk_end_block = plus_end
-
-                    self._chunk_block_spans.append((chunk_start_block.blockNumber(), chunk_end_block.blockNumber()))
-                    self._chunk_file_paths.append(current_filepath)
-
-                    # Collect context lines and the first context block for this chunk
-                    chunk_context_lines = []
-                    first_context_block = None
-                    iter_block = chunk_start_block
-                    while iter_block.isValid() and iter_block.blockNumber() <= chunk_end_block.blockNumber():
-                        if self._is_ctx(iter_block.text()):
-                            chunk_context_lines.append(iter_block.text()[1:])
-                            if first_context_block is None:
-                                first_context_block = iter_block
-                        iter_block = iter_block.next()
-                    self._chunk_context_info.append((chunk_context_lines, first_context_block))
-
-                    b = curp
-                    continue
-                else:
-                    # No '+' run follows. If we had a '-' run, treat it as a pure deletion chunk.
-                    if minus_start is not None and minus_end is not None:
-                        first_data_block = minus_start
-                        context_blocks = self._collect_preceding_context_blocks(first_data_block, self._context_before)
-                        chunk_start_block = context_blocks[0] if context_blocks else first_data_block
-                        chunk_end_block = minus_end
-
-                        self._chunk_block_spans.append((chunk_start_block.blockNumber(), chunk_end_block.blockNumber()))
-                        self._chunk_file_paths.append(current_filepath)
-
-                        # Collect context lines and the first context block for this chunk
-                        chunk_context_lines = []
-                        first_context_block = None
-                        iter_block = chunk_start_block
-                        while iter_block.isValid() and iter_block.blockNumber() <= chunk_end_block.blockNumber():
-                            if self._is_ctx(iter_block.text()):
-                                chunk_context_lines.append(iter_block.text()[1:])
-                                if first_context_block is None:
-                                    first_context_block = iter_block
-                            iter_block = iter_block.next()
-                        self._chunk_context_info.append((chunk_context_lines, first_context_block))
-
-                        b = minus_end.next()
-                        continue
-                    else:
-                        b = b.next()
-                        continue
+    def _rescan_pending(self):
+        doc = self.document()
+        bn_first, bn_last = self._pending_lines
+        block_delta = self._pending_block_delta
+        path_dirty = self._pending_path_dirty
+        self._reset_pending()
+        lines = self._lines
+        kinds = self._kinds
+        hdrs = self._file_header_bns
+
+        # An existing chunk may start before the edit and run into it; widen the region to cover it.
+        starts = self._chunk_starts
+        ends = self._chunk_ends
+        anchor = bn_first
+        k = bisect.bisect_left(ends, bn_first)
+        if k < len(starts) and starts[k] < bn_first:
+            anchor = starts[k]
+        rs = self._region_start_line(anchor)
+
+        if path_dirty:
+            j = bisect.bisect_right(hdrs, bn_last)
+            region_end = hdrs[j] if j < len(hdrs) else len(lines)
+        else:
+            m = _HEADER_RE.search(kinds, bn_last + 1)
+            region_end = m.start() if m else len(kinds)
 
-            b = b.next()
+        h = bisect.bisect_right(hdrs, rs) - 1
+        current_filepath = _parse_filepath_from_header(lines[hdrs[h]]) if h >= 0 else ""
 
-        # Mark and store position spans
-        for idx, (bn_start, bn_end) in enumerate(self._chunk_block_spans):
-            start_block = doc.findBlockByNumber(bn_start)
-            end_block = doc.findBlockByNumber(bn_end)
-            start_pos = start_block.position()
-            end_pos_excl = end_block.position() + len(end_block.text())
-            self._chunk_pos_spans.append((start_pos, end_pos_excl))
+        new_starts, new_ends, new_file_indices, new_context_counts, _ = self._scan_region(rs, region_end, current_filepath)
+        new_pos_starts, new_pos_ends = self._positions(new_starts, new_ends, rs, doc.findBlockByNumber(rs).position())
 
-            btag = start_block
-            while btag.isValid() and btag.blockNumber() <= bn_end:
-                btag.setUserState(idx)
-                btag = btag.next()
+        # Old chunks in [k0, k1) fall inside the region (old numbering) and are replaced.
+        k0 = bisect.bisect_left(ends, rs)
+        k1 = max(k0, bisect.bisect_left(starts, region_end - block_delta))
 
-        self._chunk_count = len(self._chunk_block_spans)
-        self.chunks_recomputed.emit(self._chunk_count)
+        _splice_column(starts, k0, k1, new_starts, block_delta)
+        _splice_column(ends, k0, k1, new_ends, block_delta)
+        self._chunk_cursors[k0:k1] = map(self._make_chunk_cursor, new_pos_starts, new_pos_ends)
+        self._chunk_file_idx[k0:k1] = new_file_indices
+        self._chunk_n_context[k0:k1] = new_context_counts
+        self._finish_recompute((k0, k1, len(new_starts)))
 
     def _clear_highlight(self):
-        # Keep base selections (status colors), remove only hover overlay
-        self.setExtraSelections(list(self._base_selections))
+        # Keep base selections (status colors), remove only hover overlay.
+        if self._hover_chunk is None:
+            return
+        self._hover_chunk = None
+        self.viewport().update()
+
+    def _forget_hovered_chunk(self):
+        """The hovered chunk was re-scanned away: drop its overlay so the next mouse move re-resolves it."""
+        self._clear_highlight()
+        self._last_hover_chunk = None
+        self._last_emitted_hover = None
+        self._hover_row = None
+
+    def _make_chunk_cursor(self, start_pos: int, end_pos_excl: int) -> QtGui.QTextCursor:
+        cursor = QtGui.QTextCursor(self.document())
+        cursor.setPosition(start_pos)
+        cursor.setPosition(end_pos_excl, QtGui.QTextCursor.KeepAnchor)
+        return cursor
 
     def _apply_chunk_highlight(self, chunk_idx: int):
-        if chunk_idx < 0 or chunk_idx >= len(self._chunk_pos_spans):
+        if chunk_idx < 0 or chunk_idx >= len(self._chunk_starts):
             self._clear_highlight()
             return
-        start_pos, end_pos_excl = self._chunk_pos_spans[chunk_idx]
-        sel = QtWidgets.QTextEdit.ExtraSelection()
-        # Hover uses yellow
-        sel.format = self._fmt_hover_yellow
-        sel.cursor = self.textCursor()
-        sel.cursor.setPosition(start_pos)
-        sel.cursor.setPosition(end_pos_excl, QtGui.QTextCursor.KeepAnchor)
-        # Combine base (status) selections with hover overlay
-        combined = list(self._base_selections)
-        combined.append(sel)
-        self.setExtraSelections(combined)
+        # The hover overlay is painted over the visible rows only (see paintEvent), so a huge chunk
+        # costs no more than a small one and the status selections are left alone.
+        if self._hover_chunk == chunk_idx:
+            return
+        self._hover_chunk = chunk_idx
+        self.viewport().update()
+
+    def paintEvent(self, event: QtGui.QPaintEvent):
+        super().paintEvent(event)
+        if self._hover_chunk is None:
+            return
+        cursor = self._chunk_cursors[self._hover_chunk]
+        doc = self.document()
+        first_bn = doc.findBlock(cursor.selectionStart()).blockNumber()
+        last_bn = doc.findBlock(cursor.selectionEnd()).blockNumber()
+        # Walk the visible blocks only, like a line-number gutter does
+        block = self.firstVisibleBlock()
+        block_top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
+        bottom_limit = event.rect().bottom()
+        top = bottom = None
+        while block.isValid() and block_top <= bottom_limit:
+            bn = block.blockNumber()
+            if bn > last_bn:
+                break
+            block_bottom = block_top + self.blockBoundingRect(block).height()
+            if bn >= first_bn and block.isVisible():
+                if top is None:
+                    top = block_top
+                bottom = block_bottom
+            block = block.next()
+            block_top = block_bottom
+        if top is None:
+            return
+        painter = QtGui.QPainter(self.viewport())
+        painter.setCompositionMode(QtGui.QPainter.CompositionMode_Multiply)
+        painter.fillRect(QtCore.QRectF(0, top, self.viewport().width(), bottom - top), self._hover_color)
+        painter.end()
 
     def _rebuild_base_selections(self):
-        """Rebuild persistent base selections for all chunks based on their status."""
+        """Rebuild persistent base selections for the chunks that have a status."""
         self._base_selections.clear()
-        for idx, (start_pos, end_pos_excl) in enumerate(self._chunk_pos_spans):
-            status = self._chunk_status.get(idx)
-            if not status:
-                continue
+        for idx, status in sorted(self._chunk_status.items()):
             fmt = None
             if status == self.STATUS_APPLICABLE:
                 fmt = self._fmt_state_applicable
@@ -294,9 +557,8 @@ class ChunkedPlainTextEdit(QtWidgets.QPlainTextEdit):
                 continue
             sel = QtWidgets.QTextEdit.ExtraSelection()
             sel.format = fmt
-            sel.cursor = self.textCursor()
-            sel.cursor.setPosition(start_pos)
-            sel.cursor.setPosition(end_pos_excl, QtGui.QTextCursor.KeepAnchor)
+            # Same span as the chunk's cached cursor, which already tracks edits
+            sel.cursor = self._chunk_cursors[idx]
             self._base_selections.append(sel)
 
     def set_chunk_status(self, chunk_idx: int, status: str | None):
@@ -304,32 +566,85 @@ class ChunkedPlainTextEdit(QtWidgets.QPlainTextEdit):
         Set or clear the applicability status for a chunk.
         status in {STATUS_APPLICABLE, STATUS_ALREADY, STATUS_NOT_APPLICABLE} or None to clear.
         """
-        if chunk_idx < 0 or chunk_idx >= len(self._chunk_pos_spans):
+        if chunk_idx < 0 or chunk_idx >= len(self._chunk_starts):
             return
         if status is None:
             self._chunk_status.pop(chunk_idx, None)
         else:
             self._chunk_status[chunk_idx] = status
         self._rebuild_base_selections()
-        # Apply base selections immediately (hover overlay, if any, will re-apply)
+        # Apply base selections immediately; the hover overlay is painted separately
         self.setExtraSelections(list(self._base_selections))
 
+    def _chunk_at_block(self, block_number: int) -> int:
+        """Index of the chunk containing block_number, or -1."""
+        i = bisect.bisect_right(self._chunk_starts, block_number) - 1
+        if i >= 0 and block_number <= self._chunk_ends[i]:
+            return i
+        return -1
+
+    def set_hover_emission_interval(self, ms: int):
+        """Send chunkHovered at most once per `ms` milliseconds (0: once per event-loop turn)."""
+        self._hover_emit_timer.setInterval(max(0, int(ms)))
+
+    def _emit_chunk_hovered(self, idx: int):
+        """Queue chunkHovered for idx (-1 to clear); only the latest queued index is sent."""
+        self._pending_hover = idx
+        if not self._hover_emit_timer.isActive():
+            self._hover_emit_timer.start()
+
+    def _chunk_context(self, idx: int):
+        """(context_lines, first_context_line) of a chunk, read from the line snapshot on demand."""
+        start = self._chunk_starts[idx]
+        n = self._chunk_n_context[idx]
+        return [t[1:] for t in self._lines[start:start + n]], (start if n else None)
+
+    def _send_pending_hover(self):
+        """Emit chunkHovered for the pending index, unless it would repeat the last emission."""
+        self._flush_recompute()
+        idx = self._pending_hover
+        if idx >= len(self._chunk_file_idx):
+            idx = -1
+        filepath = self._filepaths[self._chunk_file_idx[idx]] if idx >= 0 else ""
+        if self._last_emitted_hover == (idx, filepath):
+            return
+        self._last_emitted_hover = (idx, filepath)
+        if idx < 0:
+            self.chunkHovered.emit(-1, "", [], None)
+            return
+        context_lines, first_context_line = self._chunk_context(idx)
+        first_context_block = (
+            self.document().findBlockByNumber(first_context_line) if first_context_line is not None else None
+        )
+        self.chunkHovered.emit(idx, filepath, context_lines, first_context_block)
+
+    def _hover_row_key(self):
+        return self.verticalScrollBar().value(), self.document().revision(), self.viewport().width()
+
     def mouseMoveEvent(self, event: QtGui.QMouseEvent):
-        cursor = self.cursorForPosition(event.pos())
-        block = cursor.block()
-        idx = block.userState() if block.isValid() else -1
-
-        if idx is not None and idx >= 0:
-            if self._last_hover_chunk != idx:
-                self._last_hover_chunk = idx
-                QtWidgets.QToolTip.showText(self.mapToGlobal(event.pos()), f"Chunk #{idx + 1}", self)
-                filepath = self._chunk_file_paths[idx]
-                context_lines, first_context_block = self._chunk_context_info[idx]
-                self.chunkHovered.emit(idx, filepath, context_lines, first_context_block)
+        self._flush_recompute()
+        # Moving within the pixel rows of the block resolved last time cannot change the chunk;
+        # skip the layout query unless scrolling, editing or a resize has moved the blocks.
+        y = event.pos().y()
+        row = self._hover_row
+        if row is not None and row[0] <= y < row[1] and row[2:] == self._hover_row_key():
+            return super().mouseMoveEvent(event)
+        block = self.cursorForPosition(event.pos()).block()
+        geo = self.blockBoundingGeometry(block).translated(self.contentOffset())
+        self._hover_row = (geo.top(), geo.bottom()) + self._hover_row_key()
+        idx = self._chunk_at_block(block.blockNumber())
+
+        if idx >= 0:
+            if self._last_hover_chunk == idx:
+                # Still inside the same chunk: tooltip and highlight are already up to date.
+                return super().mouseMoveEvent(event)
+            self._last_hover_chunk = idx
+            QtWidgets.QToolTip.showText(self.mapToGlobal(event.pos()), f"Chunk #{idx + 1}", self)
+            self._emit_chunk_hovered(idx)
             self._apply_chunk_highlight(idx)
         else:
             if self._last_hover_chunk is not None:
-                self.chunkHovered.emit(-1, "", [], None)
+                self._emit_chunk_hovered(-1)
             self._last_hover_chunk = None
             QtWidgets.QToolTip.hideText()
             self._clear_highlight()
@@ -338,18 +653,17 @@ class ChunkedPlainTextEdit(QtWidgets.QPlainTextEdit):
 
     def leaveEvent(self, event: QtCore.QEvent):
         self._last_hover_chunk = None
+        self._hover_row = None
         QtWidgets.QToolTip.hideText()
         self._clear_highlight()
-        self.chunkHovered.emit(-1, "", [], None)
+        self._emit_chunk_hovered(-1)
         super().leaveEvent(event)
 
     def contextMenuEvent(self, event: QtGui.QContextMenuEvent):
         # Determine if the cursor is over a chunk
-        cursor = self.cursorForPosition(event.pos())
-        block = cursor.block()
-        idx = block.userState() if block.isValid() else -1
-
-        if idx is None or idx < 0:
+        self._flush_recompute()
+        idx = self._chunk_at_block(self.cursorForPosition(event.pos()).blockNumber())
+        if idx < 0:
             return super().contextMenuEvent(event)
 
         menu = QtWidgets.QMenu(self)
@@ -366,6 +680,7 @@ class ChunkedPlainTextEdit(QtWidgets.QPlainTextEdit):
                 QtWidgets.QApplication.clipboard().setText("\n".join(added_lines))
 
     def chunk_count(self) -> int:
+        self._flush_recompute()
         return self._chunk_count
 
     # NEW: Provide structured details for applying a chunk
@@ -378,31 +693,30 @@ class ChunkedPlainTextEdit(QtWidgets.QPlainTextEdit):
           removed_lines: list[str]  # '-' lines without leading '-'
           added_lines: list[str]    # '+' lines without leading '+'
         """
-        if chunk_idx < 0 or chunk_idx >= len(self._chunk_block_spans):
+        self._flush_recompute()
+        if chunk_idx < 0 or chunk_idx >= len(self._chunk_starts):
             return None
 
-        file_path = self._chunk_file_paths[chunk_idx]
-        context_lines, _first_ctx_block = self._chunk_context_info[chunk_idx]
+        file_path = self._filepaths[self._chunk_file_idx[chunk_idx]]
+        context_lines, _first_ctx_line = self._chunk_context(chunk_idx)
 
-        bn_start, bn_end = self._chunk_block_spans[chunk_idx]
-        start_block = self.document().findBlockByNumber(bn_start)
-        end_block = self.document().findBlockByNumber(bn_end)
+        bn_start = self._chunk_starts[chunk_idx]
+        bn_end = self._chunk_ends[chunk_idx]
+        lines = self._lines
+        kinds = self._kinds
 
         removed_lines = []
         added_lines = []
 
-        b = start_block
-        while b.isValid() and b.blockNumber() <= bn_end:
-            t = b.text()
-            if self._is_del(t):
-                removed_lines.append(t[1:])
-            elif self._is_add(t):
-                added_lines.append(t[1:])
-            b = b.next()
+        for n in range(bn_start, bn_end + 1):
+            if kinds[n] == KIND_DEL:
+                removed_lines.append(lines[n][1:])
+            elif kinds[n] == KIND_ADD:
+                added_lines.append(lines[n][1:])
 
         return {
             "file_path": file_path,
-            "context_lines": list(context_lines),
+            "context_lines": context_lines,
             "n_context": len(context_lines),
             "removed_lines": removed_lines,
             "added_lines": added_lines,
@@ -1,13 +1,26 @@
 import sys
 import os
-import difflib
+import hashlib
+import logging
+from collections import OrderedDict
 from pathlib import Path
 from PySide6 import QtWidgets, QtCore, QtGui
 from chunked_editor import ChunkedPlainTextEdit
 
-# You must run: pip install thefuzz python-Levenshtein
-from thefuzz import fuzz
-import os
+try:
+    # C++ scorer; process.extractOne scores every window in one native call
+    from rapidfuzz import fuzz, process
+    HAVE_RAPIDFUZZ = True
+except ImportError:
+    # You must run: pip install thefuzz python-Levenshtein
+    from thefuzz import fuzz
+    HAVE_RAPIDFUZZ = False
+
+# Debug output goes through this logger; the "Debug logs" checkbox sets its level
+log = logging.getLogger("patch_helper")
+
+# Files above this many characters get a busy cursor while the right pane builds their document
+LARGE_FILE_CHARS = 4 * 1024 * 1024
 
 # App identity for QSettings
 QtCore.QCoreApplication.setOrganizationName("Grant")
@@ -15,6 +28,58 @@ QtCore.QCoreApplication.setOrganizationDomain("grantech.co")
 QtCore.QCoreApplication.setApplicationName("InteractivePatchHelper")
 
 
+def _find_best_match(target_lines: list[str], query_lines: list[str], min_score=75) -> int | None:
+    """Finds the best fuzzy match for a block of lines. Returns 1-based starting line number."""
+    if not query_lines or not target_lines:
+        log.debug("[FUZZY] Canceled: No query or target lines.")
+        return None
+
+    num_query_lines = len(query_lines)
+    last_start = len(target_lines) - num_query_lines
+    # Verbatim context is the common case and scores 100; the first such window is what scoring would pick
+    first = query_lines[0]
+    i = -1
+    try:
+        while True:
+            i = target_lines.index(first, i + 1, last_start + 1)
+            if target_lines[i: i + num_query_lines] == query_lines:
+                log.debug("[FUZZY] SUCCESS: Exact match at line %d", i + 1)
+                return i + 1  # 1-based
+    except ValueError:
+        pass
+
+    query_str = "\n".join(query_lines)
+    best_score, best_line_num = -1, -1
+
+    if HAVE_RAPIDFUZZ:
+        windows = [
+            "\n".join(target_lines[i: i + num_query_lines])
+            for i in range(len(target_lines) - num_query_lines + 1)
+        ]
+        # Best window by unrounded score; ties keep the earliest window.
+        # No processor: rapidfuzz<3 would otherwise lowercase and strip punctuation by default.
+        match = process.extractOne(query_str, windows, scorer=fuzz.ratio, processor=None)
+        if match is not None:
+            best_score = int(round(match[1]))
+            best_line_num = match[2] + 1  # 1-based
+    else:
+        for i in range(len(target_lines) - num_query_lines + 1):
+            window_lines = target_lines[i: i + num_query_lines]
+            window_str = "\n".join(window_lines)
+            score = fuzz.ratio(query_str, window_str)
+            if score > best_score:
+                best_score = score
+                best_line_num = i + 1  # 1-based
+
+    log.debug("[FUZZY] Best match score: %s", best_score)
+    if best_score >= min_score:
+        log.debug("[FUZZY] SUCCESS: Found match at line %d (score >= %s)", best_line_num, min_score)
+    else:
+        log.debug("[FUZZY] FAILED: Best score below threshold of %s", min_score)
+
+    return best_line_num if best_score >= min_score else None
+
+
 class LineNumberArea(QtWidgets.QWidget):
     """A widget that draws line numbers for a QPlainTextEdit."""
     def __init__(self, editor):
@@ -37,6 +102,18 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
         # Holds external selections (e.g., highlight for matched/applied region)
         self._externalSelections: list[QtWidgets.QTextEdit.ExtraSelection] = []
 
+        # Laid-out line numbers reused across paints (line number -> QStaticText); dropped on font change
+        self._lineNumberTexts: dict[int, QtGui.QStaticText] = {}
+        # Current-line selection built once; highlightCurrentLine only moves its cursor
+        self._currentLineSel = QtWidgets.QTextEdit.ExtraSelection()
+        self._currentLineSel.format.setBackground(QtGui.QColor(QtCore.Qt.yellow).lighter(160))
+        self._currentLineSel.format.setProperty(QtGui.QTextFormat.FullWidthSelection, True)
+        # (block number, document revision, read-only) last highlighted; None forces a refresh
+        self._currentLineKey: tuple[int, int, bool] | None = None
+
+        # Width of one digit in the current font; refreshed on font change
+        self._digitAdvance = self.fontMetrics().horizontalAdvance('9')
+
         self.blockCountChanged.connect(self.updateLineNumberAreaWidth)
         self.updateRequest.connect(self.updateLineNumberArea)
         self.cursorPositionChanged.connect(self.highlightCurrentLine)
@@ -48,19 +125,18 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
         """Set extra selections to be rendered alongside current-line highlight."""
         self._externalSelections = selections or []
         # Re-apply highlight to merge them
+        self._currentLineKey = None
         self.highlightCurrentLine()
 
     def clearExternalSelections(self):
         self.setExternalSelections([])
 
+    def hasExternalSelections(self) -> bool:
+        return bool(self._externalSelections)
+
     def lineNumberAreaWidth(self):
-        digits = 1
-        count = max(1, self.blockCount())
-        while count >= 10:
-            count //= 10
-            digits += 1
-        space = 10 + self.fontMetrics().horizontalAdvance('9') * digits
-        return space
+        digits = len(str(max(1, self.blockCount())))
+        return 10 + self._digitAdvance * digits
 
     def updateLineNumberAreaWidth(self, _):
         self.setViewportMargins(self.lineNumberAreaWidth(), 0, 0, 0)
@@ -80,15 +156,19 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
         self.lineNumberArea.setGeometry(QtCore.QRect(cr.left(), cr.top(), self.lineNumberAreaWidth(), cr.height()))
 
     def highlightCurrentLine(self):
+        cursor = self.textCursor()
+        read_only = self.isReadOnly()
+        # Moving within the same line of an unchanged document leaves the selections as they are
+        key = (cursor.blockNumber(), self.document().revision(), read_only)
+        if key == self._currentLineKey:
+            return
+        self._currentLineKey = key
+
         extraSelections = []
-        if not self.isReadOnly():
-            selection = QtWidgets.QTextEdit.ExtraSelection()
-            lineColor = QtGui.QColor(QtCore.Qt.yellow).lighter(160)
-            selection.format.setBackground(lineColor)
-            selection.format.setProperty(QtGui.QTextFormat.FullWidthSelection, True)
-            selection.cursor = self.textCursor()
-            selection.cursor.clearSelection()
-            extraSelections.append(selection)
+        if not read_only:
+            cursor.clearSelection()
+            self._currentLineSel.cursor = cursor
+            extraSelections.append(self._currentLineSel)
 
         # Merge with external selections (e.g., matched/applied region)
         if self._externalSelections:
@@ -96,23 +176,37 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
 
         self.setExtraSelections(extraSelections)
 
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QtCore.QEvent.FontChange:
+            self._lineNumberTexts.clear()
+            self._digitAdvance = self.fontMetrics().horizontalAdvance('9')
+            self.updateLineNumberAreaWidth(0)
+
     def lineNumberAreaPaintEvent(self, event):
         painter = QtGui.QPainter(self.lineNumberArea)
-        painter.fillRect(event.rect(), QtCore.Qt.lightGray)
+        rect = event.rect()
+        painter.fillRect(rect, QtCore.Qt.lightGray)
+        painter.setPen(QtCore.Qt.black)
+
+        texts = self._lineNumberTexts
+        if len(texts) > 4096:
+            texts.clear()
+        right = self.lineNumberArea.width() - 5
+        rect_top, rect_bottom = rect.top(), rect.bottom()
 
         block = self.firstVisibleBlock()
         blockNumber = block.blockNumber()
         top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
         bottom = top + self.blockBoundingRect(block).height()
 
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(blockNumber + 1)
-                painter.setPen(QtCore.Qt.black)
-                painter.drawText(
-                    0, int(top), self.lineNumberArea.width() - 5, self.fontMetrics().height(),
-                    QtCore.Qt.AlignRight, number
-                )
+        while block.isValid() and top <= rect_bottom:
+            if block.isVisible() and bottom >= rect_top:
+                text = texts.get(blockNumber)
+                if text is None:
+                    text = texts[blockNumber] = QtGui.QStaticText(str(blockNumber + 1))
+                    text.prepare(QtGui.QTransform(), self.font())
+                painter.drawStaticText(QtCore.QPointF(right - text.size().width(), int(top)), text)
 
             block = block.next()
             top = bottom
@@ -120,6 +214,53 @@ class CodeEditor(QtWidgets.QPlainTextEdit):
             blockNumber += 1
 
 
+class FuzzyMatchSignals(QtCore.QObject):
+    """Carries FuzzyMatchWorker results back to the GUI thread."""
+    # (token, 1-based line number or None)
+    matchReady = QtCore.Signal(int, object)
+
+
+class FuzzyMatchWorker(QtCore.QRunnable):
+    """Runs _find_best_match on the thread pool and reports the result tagged with the caller's token."""
+    def __init__(self, query_lines: list[str], target_lines: list[str], min_score: int, token: int,
+                 signals: FuzzyMatchSignals):
+        super().__init__()
+        self.query_lines = query_lines
+        # Snapshot list; MainWindow replaces rather than mutates it on edits
+        self.target_lines = target_lines
+        self.min_score = min_score
+        self.token = token
+        self.signals = signals
+
+    def run(self):
+        line_num = _find_best_match(self.target_lines, self.query_lines, self.min_score)
+        self.signals.matchReady.emit(self.token, line_num)
+
+
+class FileLoadSignals(QtCore.QObject):
+    """Carries FileLoadWorker results back to the GUI thread."""
+    # (token, path, text, error message or None)
+    loaded = QtCore.Signal(int, str, str, object)
+
+
+class FileLoadWorker(QtCore.QRunnable):
+    """Reads a text file on the thread pool and reports its content tagged with the caller's token."""
+    def __init__(self, path: str, token: int, signals: FileLoadSignals):
+        super().__init__()
+        self.path = path
+        self.token = token
+        self.signals = signals
+
+    def run(self):
+        try:
+            with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                content = f.read()
+        except Exception as e:
+            self.signals.loaded.emit(self.token, self.path, "", str(e))
+            return
+        self.signals.loaded.emit(self.token, self.path, content, None)
+
+
 class MainWindow(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
@@ -146,6 +287,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self.apply_btn = QtWidgets.QPushButton("Apply Hovered Chunk")
         self.apply_btn.setEnabled(False)
         self.apply_btn.clicked.connect(self._apply_hovered_chunk_if_possible)
+        self.apply_all_btn = QtWidgets.QPushButton("Apply All")
+        self.apply_all_btn.setToolTip("Apply every chunk that applies cleanly to the current buffer.")
+        self.apply_all_btn.clicked.connect(self.apply_all_applicable)
 
         top_row.addWidget(QtWidgets.QLabel("Root:"))
         top_row.addWidget(self.root_edit, stretch=1)
@@ -153,6 +297,7 @@ class MainWindow(QtWidgets.QMainWindow):
         top_row.addWidget(self.debug_check)
         top_row.addWidget(self.relaunch_btn)
         top_row.addWidget(self.apply_btn)
+        top_row.addWidget(self.apply_all_btn)
 
         # Main editor area with a splitter
         splitter = QtWidgets.QSplitter(QtCore.Qt.Horizontal)
@@ -164,6 +309,8 @@ class MainWindow(QtWidgets.QMainWindow):
         # For stable geometry
         self.patch_edit.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
         self.patch_edit.chunkHovered.connect(self._on_chunk_hovered)
+        # Hover evaluation reads/matches the whole file; handle at most one chunk per 60 ms while sweeping
+        self.patch_edit.set_hover_emission_interval(60)
         # Context menu "Apply Chunk" handler
         self.patch_edit.chunkApplyRequested.connect(self._on_chunk_apply_requested)
 
@@ -213,6 +360,30 @@ class MainWindow(QtWidgets.QMainWindow):
         self._hover_already_applied: bool = False
         self._hover_apply_start_idx: int | None = None
         self._hover_highlight_len: int = 0
+        # Highlight formats by colour (rgba), built on first use and shared by every hover/apply highlight
+        self._highlight_formats: dict[int, QtGui.QTextCharFormat] = {}
+        # (start line, end line, rgba, document revision) of the last highlight set
+        self._last_highlight: tuple[int, int, int, int] | None = None
+
+        # Lines of the right buffer, split once per edit rather than on every hover (None: stale)
+        self._viewer_lines: list[str] | None = None
+        # (root dir, chunk file) -> resolved absolute path; resolve() stats every path component
+        self._resolved_paths: dict[tuple[str, str], Path] = {}
+        # Match results against the current _viewer_lines, (context lines, min_score) -> line; cleared on edits
+        self._match_cache: OrderedDict[tuple[tuple[str, ...], int], int | None] = OrderedDict()
+
+        # The right pane's file is read on the thread pool; only the latest requested load is used
+        self._load_token = 0
+        self._loading_path: str | None = None
+        self._loading_label = ""  # chunk-relative path for status messages
+        self._load_signals = FileLoadSignals(self)
+        self._load_signals.loaded.connect(self._on_file_loaded)
+
+        # Hover matching runs on the thread pool; results whose token is no longer current are dropped
+        self._hover_token = 0
+        self._hover_match_details: dict | None = None
+        self._match_signals = FuzzyMatchSignals(self)
+        self._match_signals.matchReady.connect(self._on_fuzzy_match_ready)
 
         # When user edits the right buffer, clear stale highlights and re-evaluate current hover state (debounced)
         self._debounce_timer = QtCore.QTimer(self)
@@ -221,14 +392,28 @@ class MainWindow(QtWidgets.QMainWindow):
         self._debounce_timer.timeout.connect(self._reevaluate_hover_state_once)
         self.file_viewer.textChanged.connect(self._on_file_text_changed)
 
+        # One settings store for the window's lifetime; Qt writes it back lazily
+        self._settings = QtCore.QSettings(self)
+        # Digest of the patch text as last loaded/saved; the side file is rewritten only when it differs
+        self._patch_text_hash: bytes | None = None
         self.load_settings()
 
+        # Autosave: edits only mark settings dirty; the timer writes them at most once per second
+        self._settings_dirty = False
+        self._settings_timer = QtCore.QTimer(self)
+        self._settings_timer.setSingleShot(True)
+        self._settings_timer.setInterval(1000)
+        self._settings_timer.timeout.connect(self._flush_settings)
+        self.patch_edit.textChanged.connect(self._mark_settings_dirty)
+        self.root_edit.textChanged.connect(self._mark_settings_dirty)
+        self.debug_check.toggled.connect(self._mark_settings_dirty)
+
     def current_view_file(self) -> str | None:
         v = self.file_viewer.property("current_file")
         return str(v) if v else None
 
     def is_view_empty(self) -> bool:
-        return (self.file_viewer.toPlainText() == "") and (self.current_view_file() is None)
+        return self.file_viewer.document().isEmpty() and (self.current_view_file() is None)
 
     @QtCore.Slot(bool)
     def _on_debug_toggled(self, on: bool):
@@ -238,10 +423,15 @@ class MainWindow(QtWidgets.QMainWindow):
         self._debug = on
         self.patch_edit.set_debug(on)  # pass to child widget for its own logs
         self.statusBar().showMessage("Debug logging " + ("enabled" if on else "disabled"), 2000)
-        print("\n--- Debug logging " + ("enabled" if on else "disabled") + " ---")
+        log.setLevel(logging.DEBUG if on else logging.INFO)
+        log.info("--- Debug logging %s ---", "enabled" if on else "disabled")
 
     @QtCore.Slot()
     def _on_file_text_changed(self):
+        self._viewer_lines = None
+        self._match_cache.clear()
+        # Any match in flight was computed against the old text
+        self._hover_token += 1
         # Clear transient highlight and re-evaluate applicability after a short debounce
         self.file_viewer.clearExternalSelections()
         self._debounce_timer.stop()
@@ -254,7 +444,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self._clear_diff_preview()
             return
         # Re-run applicability based on current buffer
-        self._evaluate_and_update_ui_for_hovered_chunk()
+        self._start_hovered_chunk_evaluation()
 
     @QtCore.Slot(int, str, list, QtGui.QTextBlock)
     def _on_chunk_hovered(self, chunk_idx: int, file_path: str, context_lines: list, _first_context_block: QtGui.QTextBlock):
@@ -264,6 +454,7 @@ class MainWindow(QtWidgets.QMainWindow):
         """
         # Clear when leaving a chunk
         if chunk_idx == -1 or not file_path:
+            self._hover_token += 1
             self._hover_chunk_idx = None
             self._hover_chunk_file = None
             self._hover_context_lines = []
@@ -280,18 +471,18 @@ class MainWindow(QtWidgets.QMainWindow):
         # Clear any previous status for different files if needed is intentionally skipped,
         # as statuses are per-chunk and persist to indicate applicability/already-applied info.
 
-        # Update hover context
+        # Update hover context; a match still running for the previous chunk is now stale
+        self._hover_token += 1
         self._hover_chunk_idx = chunk_idx
         self._hover_chunk_file = file_path.replace("\\", "/")
         self._hover_context_lines = list(context_lines)
 
-        if self._debug:
-            print("\n" + "=" * 20 + f" HOVER CHUNK #{chunk_idx + 1} " + "=" * 20)
-            print(f"File Path (rel): {self._hover_chunk_file}")
-            print("Context lines to search for:")
-            for line in context_lines:
-                print(f"  > {line}")
-            print("-" * 58)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "\n%s HOVER CHUNK #%d %s\nFile Path (rel): %s\nContext lines to search for:\n%s%s",
+                "=" * 20, chunk_idx + 1, "=" * 20, self._hover_chunk_file,
+                "".join(f"  > {line}\n" for line in context_lines), "-" * 58,
+            )
 
         # Resolve full path (for loading if needed)
         root_dir = self.root_edit.text().strip()
@@ -301,30 +492,33 @@ class MainWindow(QtWidgets.QMainWindow):
             self._clear_diff_preview()
             return
 
-        root = Path(root_dir).expanduser()
         rel = Path(self._hover_chunk_file)
-        full_path = (root / rel).resolve(strict=False)
+        full_path = self._resolve_chunk_path(root_dir, self._hover_chunk_file)
 
         # Load only if right panel is empty
         current_path = self.current_view_file()
         if self.is_view_empty():
             # Try to load file if it exists; otherwise, keep an empty buffer but set current_file property
             if full_path.is_file():
-                try:
-                    with open(full_path, "r", encoding="utf-8", errors="replace") as f:
-                        content = f.read()
-                    self.file_viewer.setPlainText(content)
-                    self.file_viewer.setProperty("current_file", str(full_path))
-                    self.statusBar().showMessage(f"Loaded: {rel.as_posix()}", 4000)
-                except Exception as e:
-                    self.file_viewer.setPlainText(f"Error reading file: {full_path}\n\n{str(e)}")
-                    self.file_viewer.setProperty("current_file", str(full_path))
-                    self.statusBar().showMessage(f"Error reading {rel.as_posix()}", 4000)
+                # Read off the GUI thread; _on_file_loaded fills the pane and evaluates the hovered chunk
+                if self._loading_path != str(full_path):
+                    self._load_token += 1
+                    self._loading_path = str(full_path)
+                    self._loading_label = rel.as_posix()
+                    self.statusBar().showMessage(f"Loading {rel.as_posix()}…")
+                    worker = FileLoadWorker(str(full_path), self._load_token, self._load_signals)
+                    QtCore.QThreadPool.globalInstance().start(worker)
+                self.apply_btn.setEnabled(False)
+                return
             else:
                 # Start with empty buffer but remember target file path
+                self._load_token += 1
+                self._loading_path = None
                 self.file_viewer.setPlainText("")
                 self.file_viewer.setProperty("current_file", str(full_path))
                 self.statusBar().showMessage(f"File not found; editing new buffer: {rel.as_posix()}", 4000)
+            # Loading is not a user edit: the evaluation below replaces the debounced re-evaluation it queued
+            self._debounce_timer.stop()
         else:
             # Reuse existing buffer; if it's a different file, do not switch
             if current_path and Path(current_path) != full_path:
@@ -336,33 +530,122 @@ class MainWindow(QtWidgets.QMainWindow):
                 self._clear_diff_preview()
                 return
 
-        # Evaluate applicability and update highlight/UI
-        self._evaluate_and_update_ui_for_hovered_chunk()
+        # Evaluate applicability and update highlight/UI once the match comes back
+        self._start_hovered_chunk_evaluation()
 
-    def _evaluate_and_update_ui_for_hovered_chunk(self):
-        """Evaluate applicability of the currently hovered chunk against the current buffer. Update UI accordingly."""
+    @QtCore.Slot(int, str, str, object)
+    def _on_file_loaded(self, token: int, path: str, content: str, error):
+        if token != self._load_token:
+            return
+        self._loading_path = None
+        # The pane may have been filled (typed into) while the file was being read
+        if not self.is_view_empty():
+            return
+        name = self._loading_label
+        # Building the document for a big file blocks for a while; show that the app is busy
+        large = len(content) > LARGE_FILE_CHARS
+        if large:
+            QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            if error is None:
+                self.file_viewer.setPlainText(content)
+                self.statusBar().showMessage(f"Loaded: {name}", 4000)
+            else:
+                self.file_viewer.setPlainText(f"Error reading file: {path}\n\n{error}")
+                self.statusBar().showMessage(f"Error reading {name}", 4000)
+            self.file_viewer.setProperty("current_file", path)
+        finally:
+            if large:
+                QtWidgets.QApplication.restoreOverrideCursor()
+        # Loading is not a user edit: evaluate now instead of after the debounce it queued
+        self._debounce_timer.stop()
+        if self._hover_chunk_idx is not None:
+            self._start_hovered_chunk_evaluation()
+
+    def _resolve_chunk_path(self, root_dir: str, rel_path: str) -> Path:
+        """Absolute path of a chunk's file under root_dir, resolved once per (root, file)."""
+        key = (root_dir, rel_path)
+        full_path = self._resolved_paths.get(key)
+        if full_path is None:
+            if len(self._resolved_paths) > 1024:
+                self._resolved_paths.clear()
+            full_path = (Path(root_dir).expanduser() / rel_path).resolve(strict=False)
+            self._resolved_paths[key] = full_path
+        return full_path
+
+    def _hovered_chunk_details(self) -> dict | None:
+        """Details of the hovered chunk if it targets the loaded buffer; otherwise disable Apply and return None."""
         if self._hover_chunk_idx is None or not self._hover_chunk_file:
             self.apply_btn.setEnabled(False)
             self._clear_diff_preview()
-            return
+            return None
 
         # Extract details for hovered chunk
         details = self.patch_edit.get_chunk_details(self._hover_chunk_idx)
         if not details:
             self.apply_btn.setEnabled(False)
             self._clear_diff_preview()
-            return
+            return None
 
         # Ensure file path matches the loaded buffer (we already constrained on hover, but double-check)
         current_path = self.current_view_file()
         if not current_path or (details["file_path"].replace("\\", "/") not in str(current_path).replace("\\", "/")):
             self.apply_btn.setEnabled(False)
             self._clear_diff_preview()
+            return None
+        return details
+
+    def _start_hovered_chunk_evaluation(self):
+        """Match the hovered chunk on the thread pool; _on_fuzzy_match_ready finishes the evaluation."""
+        self._hover_token += 1
+        # Until the result arrives, Apply must not reuse the previous chunk's position
+        self._hover_applicable = False
+        self._hover_already_applied = False
+        self._hover_apply_start_idx = None
+        self._hover_highlight_len = 0
+        details = self._hovered_chunk_details()
+        if details is None:
+            self._hover_match_details = None
+            return
+        lines = self._file_viewer_lines()
+        key = (tuple(details["context_lines"]), 60)
+        if key in self._match_cache:
+            self._hover_match_details = None
+            self._match_cache.move_to_end(key)
+            self._update_ui_for_hovered_chunk(details, lines, self._match_cache[key])
             return
+        self.apply_btn.setEnabled(False)
+        self._hover_match_details = details
+        worker = FuzzyMatchWorker(
+            details["context_lines"], lines, 60, self._hover_token, self._match_signals
+        )
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    @QtCore.Slot(int, object)
+    def _on_fuzzy_match_ready(self, token: int, match_line_num):
+        if token != self._hover_token:
+            return
+        details = self._hover_match_details
+        self._hover_match_details = None
+        # The patch may have been edited while matching; only use the result if the chunk is unchanged
+        if details is None or details != self._hovered_chunk_details():
+            return
+        self._remember_match((tuple(details["context_lines"]), 60), match_line_num)
+        self._update_ui_for_hovered_chunk(details, self._file_viewer_lines(), match_line_num)
 
-        # Compute match and applicability on current buffer
-        lines = self.file_viewer.toPlainText().splitlines()
+    def _evaluate_and_update_ui_for_hovered_chunk(self):
+        """Evaluate applicability of the currently hovered chunk against the current buffer. Update UI accordingly."""
+        # Synchronous path for apply; hovering goes through _start_hovered_chunk_evaluation
+        self._hover_token += 1
+        details = self._hovered_chunk_details()
+        if details is None:
+            return
+        lines = self._file_viewer_lines()
         match_line_num = self._find_best_match(lines, details["context_lines"], min_score=60)
+        self._update_ui_for_hovered_chunk(details, lines, match_line_num)
+
+    def _update_ui_for_hovered_chunk(self, details: dict, lines: list[str], match_line_num: int | None):
+        """Compute applicability from a context match and update status, highlight, Apply button and tooltip."""
         applicable, already_applied, apply_start_idx, highlight_len = self._evaluate_chunk_applicability(
             lines, details, match_line_num
         )
@@ -434,6 +717,13 @@ class MainWindow(QtWidgets.QMainWindow):
                 status = "Not applicable"
             QtWidgets.QToolTip.showText(QtGui.QCursor.pos(), f"Chunk #{self._hover_chunk_idx + 1}  {status}", self.patch_edit)
 
+    def _file_viewer_lines(self) -> list[str]:
+        """Lines of the right buffer (shared; do not mutate), re-split only after the text changes."""
+        if self._viewer_lines is None:
+            # Split on "\n" only so line i is always document block i (splitlines also breaks on \f, \x1c, ...)
+            self._viewer_lines = self.file_viewer.toPlainText().split("\n")
+        return self._viewer_lines
+
     @QtCore.Slot(int)
     def _on_chunk_apply_requested(self, chunk_idx: int):
         """Apply from the left context menu; internally delegates to the same logic as the top button."""
@@ -467,9 +757,9 @@ class MainWindow(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.information(self, "Apply Chunk", f"Open the target file first: {rel}")
             return
 
-        # Ensure applicability computed
-        lines = self.file_viewer.toPlainText().splitlines()
+        # Ensure applicability computed; the splice below works on document blocks and needs no line list
         if self._hover_apply_start_idx is None or not self._hover_applicable:
+            lines = self._file_viewer_lines()
             match_line_num = self._find_best_match(lines, details["context_lines"], min_score=60)
             applicable, already, start_idx, hlen = self._evaluate_chunk_applicability(lines, details, match_line_num)
             if not applicable or already:
@@ -480,8 +770,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self._hover_highlight_len = hlen
 
         # Apply to in-memory buffer only
-        new_lines = self._apply_at(lines, self._hover_apply_start_idx, details["removed_lines"], details["added_lines"])
-        self.file_viewer.setPlainText("\n".join(new_lines))
+        self._splice_file_viewer_lines(self._hover_apply_start_idx, len(details["removed_lines"]), details["added_lines"])
         self.file_viewer.document().setModified(True)
 
         applied_start_line = self._hover_apply_start_idx + 1  # 1-based
@@ -501,33 +790,72 @@ class MainWindow(QtWidgets.QMainWindow):
             self.patch_edit.set_chunk_status(
                 self._hover_chunk_idx, ChunkedPlainTextEdit.STATUS_ALREADY
             )
-    def _find_best_match(self, target_lines: list[str], query_lines: list[str], min_score=75) -> int | None:
-        """Finds the best fuzzy match for a block of lines. Returns 1-based starting line number."""
-        if not query_lines or not target_lines:
-            if self._debug:
-                print("[FUZZY] Canceled: No query or target lines.")
-            return None
-
-        query_str = "\n".join(query_lines)
-        num_query_lines = len(query_lines)
-        best_score, best_line_num = -1, -1
+    def apply_all_applicable(self):
+        """Apply every chunk for the loaded file that applies to the current buffer, as one edit and one undo step."""
+        current_path = self.current_view_file()
+        if not current_path:
+            QtWidgets.QMessageBox.information(self, "Apply All", "Open the target file first.")
+            return
+        current_path_norm = str(current_path).replace("\\", "/")
+
+        # Evaluate every chunk against one snapshot of the buffer
+        lines = self._file_viewer_lines()
+        edits = []  # (start_idx, n_removed, added, chunk_idx)
+        for idx in range(self.patch_edit.chunk_count()):
+            details = self.patch_edit.get_chunk_details(idx)
+            if not details or details["file_path"].replace("\\", "/") not in current_path_norm:
+                continue
+            match_line_num = self._find_best_match(lines, details["context_lines"], min_score=60)
+            applicable, already, start_idx, _hlen = self._evaluate_chunk_applicability(lines, details, match_line_num)
+            if applicable and not already and start_idx is not None:
+                edits.append((start_idx, len(details["removed_lines"]), details["added_lines"], idx))
+
+        # Drop edits overlapping an earlier one; the rest go in back to front so earlier indices stay valid
+        edits.sort(key=lambda e: e[0])
+        kept = []
+        end = -1
+        for edit in edits:
+            if edit[0] < end or (edit[0] == end and edit[1] == 0 and kept and kept[-1][1] == 0):
+                continue
+            kept.append(edit)
+            end = edit[0] + edit[1]
+        if not kept:
+            self.statusBar().showMessage("No applicable chunks for the current buffer.", 4000)
+            return
 
-        for i in range(len(target_lines) - num_query_lines + 1):
-            window_lines = target_lines[i: i + num_query_lines]
-            window_str = "\n".join(window_lines)
-            score = fuzz.ratio(query_str, window_str)
-            if score > best_score:
-                best_score = score
-                best_line_num = i + 1  # 1-based
+        cur = QtGui.QTextCursor(self.file_viewer.document())
+        cur.beginEditBlock()
+        for start_idx, n_removed, added, _idx in reversed(kept):
+            self._splice_file_viewer_lines(start_idx, n_removed, added)
+        cur.endEditBlock()
+        self.file_viewer.document().setModified(True)
 
-        if self._debug:
-            print(f"[FUZZY] Best match score: {best_score}")
-            if best_score >= min_score:
-                print(f"[FUZZY] SUCCESS: Found match at line {best_line_num} (score >= {min_score})")
-            else:
-                print(f"[FUZZY] FAILED: Best score below threshold of {min_score}")
+        for edit in kept:
+            self.patch_edit.set_chunk_status(edit[3], ChunkedPlainTextEdit.STATUS_ALREADY)
+        skipped = len(edits) - len(kept)
+        msg = f"Applied {len(kept)} chunk(s) (in-memory only) to: {Path(current_path).name}"
+        if skipped:
+            msg += f"; skipped {skipped} overlapping"
+        self.statusBar().showMessage(msg, 4000)
 
-        return best_line_num if best_score >= min_score else None
+    def _find_best_match(self, target_lines: list[str], query_lines: list[str], min_score=75) -> int | None:
+        """Finds the best fuzzy match for a block of lines. Returns 1-based starting line number."""
+        # Results are only memoised for the current buffer's lines
+        if target_lines is not self._viewer_lines:
+            return _find_best_match(target_lines, query_lines, min_score)
+        key = (tuple(query_lines), min_score)
+        if key in self._match_cache:
+            self._match_cache.move_to_end(key)
+            return self._match_cache[key]
+        line_num = _find_best_match(target_lines, query_lines, min_score)
+        self._remember_match(key, line_num)
+        return line_num
+
+    def _remember_match(self, key: tuple[tuple[str, ...], int], line_num: int | None):
+        self._match_cache[key] = line_num
+        self._match_cache.move_to_end(key)
+        if len(self._match_cache) > 256:
+            self._match_cache.popitem(last=False)
 
     def _evaluate_chunk_applicability(self, lines: list[str], details: dict, match_line_num: int | None):
         """
@@ -583,24 +911,19 @@ class MainWindow(QtWidgets.QMainWindow):
         """Scrolls the target editor so that target_line_num is at the top of the viewport."""
         target_block = target_editor.document().findBlockByNumber(target_line_num - 1)
         if not target_block.isValid():
-            if self._debug:
-                print("[ALIGN] FAILED: Target line number is invalid.")
+            log.debug("[ALIGN] FAILED: Target line number is invalid.")
             return
 
         cur = target_editor.textCursor()
         cur.setPosition(target_block.position())
         target_editor.setTextCursor(cur)
 
-        # Ensure it's visible first, then nudge so the line sits at the top of the viewport.
-        target_editor.ensureCursorVisible()
-
-        rect = target_editor.cursorRect(cur)  # viewport coordinates
+        # QPlainTextEdit scrolls in visual lines, so the block's first line number is the value that puts it on top
         sb = target_editor.verticalScrollBar()
         before = sb.value()
-        sb.setValue(before + rect.top())
+        sb.setValue(target_block.firstLineNumber())
 
-        if self._debug:
-            print(f"[ALIGN] Top-align: cursor_top={rect.top()} scrollbar: {before} -> {sb.value()}")
+        log.debug("[ALIGN] Top-align: line=%d scrollbar: %d -> %d", target_line_num, before, sb.value())
 
     def _highlight_context_in_file_viewer(self, start_line_num: int, num_lines: int,
                                           color: QtGui.QColor = QtGui.QColor(128, 200, 255, 120)):
@@ -609,38 +932,47 @@ class MainWindow(QtWidgets.QMainWindow):
         start_idx = max(0, start_line_num - 1)
         end_idx = start_idx + max(0, num_lines - 1)
 
+        # Same range, colour and text as the highlight still showing: nothing to redo
+        key = (start_idx, end_idx, color.rgba(), doc.revision())
+        if key == self._last_highlight and self.file_viewer.hasExternalSelections():
+            return
+        self._last_highlight = key
+
         start_block = doc.findBlockByNumber(start_idx)
         end_block = doc.findBlockByNumber(end_idx)
 
         if not start_block.isValid() or not end_block.isValid():
             self.file_viewer.clearExternalSelections()
-            if self._debug:
-                print("[HILITE] Invalid block range for highlighting.")
+            log.debug("[HILITE] Invalid block range for highlighting.")
             return
 
         cur = QtGui.QTextCursor(doc)
         cur.setPosition(start_block.position())
         # Span to end of end_block's text
-        end_pos = end_block.position() + len(end_block.text())
+        end_pos = end_block.position() + end_block.length() - 1
         cur.setPosition(end_pos, QtGui.QTextCursor.KeepAnchor)
 
         sel = QtWidgets.QTextEdit.ExtraSelection()
-        fmt = QtGui.QTextCharFormat()
-        fmt.setBackground(QtGui.QBrush(color))
-        fmt.setProperty(QtGui.QTextFormat.FullWidthSelection, True)
+        fmt = self._highlight_formats.get(color.rgba())
+        if fmt is None:
+            fmt = self._highlight_formats[color.rgba()] = QtGui.QTextCharFormat()
+            fmt.setBackground(QtGui.QBrush(color))
+            fmt.setProperty(QtGui.QTextFormat.FullWidthSelection, True)
         sel.format = fmt
         sel.cursor = cur
 
         # Apply without losing current-line highlight
         self.file_viewer.setExternalSelections([sel])
 
-        if self._debug:
-            print(f"[HILITE] Highlighting lines {start_idx + 1}..{end_idx + 1}")
+        log.debug("[HILITE] Highlighting lines %d..%d", start_idx + 1, end_idx + 1)
 
     @staticmethod
     def _slice_equals(haystack: list[str], start: int, needle: list[str]) -> bool:
         if start < 0 or start + len(needle) > len(haystack):
             return False
+        # Cheap first-line gate before slicing
+        if needle and haystack[start] != needle[0]:
+            return False
         return haystack[start:start + len(needle)] == needle
 
     @staticmethod
@@ -655,24 +987,65 @@ class MainWindow(QtWidgets.QMainWindow):
             return around
         lo = max(0, around - window)
         hi = min(n - m, around + window)
-        for i in range(lo, hi + 1):
-            if lines[i:i + m] == seq:
-                return i
-        return None
+        if hi < lo:
+            return None
+        # Only positions holding seq's first line need the full slice compare; list.index finds them in C
+        first = seq[0]
+        i = lo - 1
+        try:
+            while True:
+                i = lines.index(first, i + 1, hi + 1)
+                if lines[i:i + m] == seq:
+                    return i
+        except ValueError:
+            return None
 
-    @staticmethod
-    def _apply_at(lines: list[str], start_idx: int, removed: list[str], added: list[str]) -> list[str]:
-        """Return a new list with removed block replaced by added block at start_idx."""
-        if removed:
-            return lines[:start_idx] + added + lines[start_idx + len(removed):]
+    def _splice_file_viewer_lines(self, start_idx: int, n_removed: int, added: list[str]):
+        """
+        Replace n_removed lines at 0-based start_idx of the right buffer with added (pure insertion if n_removed is 0).
+        Edits only the affected blocks, as one undo step, instead of resetting the whole document.
+        """
+        doc = self.file_viewer.document()
+        cur = QtGui.QTextCursor(doc)
+        text = "\n".join(added)
+        cur.beginEditBlock()
+        if n_removed:
+            first = doc.findBlockByNumber(start_idx)
+            last = doc.findBlockByNumber(start_idx + n_removed - 1)
+            last_end = last.position() + last.length() - 1
+            if added:
+                cur.setPosition(first.position())
+                cur.setPosition(last_end, QtGui.QTextCursor.KeepAnchor)
+                cur.insertText(text)
+            else:
+                # Pure deletion: take one line separator along with the lines
+                if last.next().isValid():
+                    cur.setPosition(first.position())
+                    cur.setPosition(last.next().position(), QtGui.QTextCursor.KeepAnchor)
+                elif first.previous().isValid():
+                    prev = first.previous()
+                    cur.setPosition(prev.position() + prev.length() - 1)
+                    cur.setPosition(last_end, QtGui.QTextCursor.KeepAnchor)
+                else:
+                    cur.setPosition(first.position())
+                    cur.setPosition(last_end, QtGui.QTextCursor.KeepAnchor)
+                cur.removeSelectedText()
         else:
-            # pure insertion
-            return lines[:start_idx] + added + lines[start_idx:]
+            block = doc.findBlockByNumber(start_idx)
+            if block.isValid():
+                cur.setPosition(block.position())
+                cur.insertText(text + "\n")
+            else:
+                cur.movePosition(QtGui.QTextCursor.End)
+                cur.insertText("\n" + text)
+        cur.endEditBlock()
 
     def choose_root(self):
         current = self.root_edit.text() or os.getcwd()
         directory = QtWidgets.QFileDialog.getExistingDirectory(self, "Choose Root Directory", current)
         if directory:
+            # Re-choosing a root also picks up symlinks changed since paths were resolved
+            self._resolved_paths.clear()
             self.root_edit.setText(directory)
             self.statusBar().showMessage(f"Root directory set to: {directory}", 3000)
             # Update tree view root to selected directory
@@ -682,6 +1055,8 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def relaunch_app(self):
         self.save_settings()
+        # The new process reads the settings right away, so flush them now
+        self._settings.sync()
         if getattr(sys, "frozen", False):
             program, arguments, workdir = sys.argv[0], sys.argv[1:], os.path.dirname(sys.argv[0])
         else:
@@ -693,7 +1068,7 @@ class MainWindow(QtWidgets.QMainWindow):
         QtWidgets.QApplication.quit()
 
     def load_settings(self):
-        s = QtCore.QSettings()
+        s = self._settings
         geom = s.value("window/geometry")
         state = s.value("window/state")
         if geom:
@@ -702,7 +1077,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self.restoreState(state)
         root = s.value("app/rootDir", os.getcwd(), type=str)
         self.root_edit.setText(root)
-        text = s.value("app/patchText", "", type=str)
+        text = self._load_patch_text()
         if text:
             self.patch_edit.setPlainText(text)
         debug_on = bool(s.value("app/debug", False, type=bool))
@@ -719,22 +1094,79 @@ class MainWindow(QtWidgets.QMainWindow):
         self._apply_debug_state(debug_on)
 
     def save_settings(self):
-        s = QtCore.QSettings()
+        s = self._settings
         s.setValue("window/geometry", self.saveGeometry())
         s.setValue("window/state", self.saveState())
         s.setValue("app/rootDir", self.root_edit.text())
-        s.setValue("app/patchText", self.patch_edit.toPlainText())
+        self._save_patch_text(self.patch_edit.toPlainText())
         s.setValue("app/debug", self.debug_check.isChecked())
-        s.sync()
+
+    @staticmethod
+    def _patch_text_path() -> Path:
+        base = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.AppDataLocation)
+        return Path(base) / "patch.txt"
+
+    @staticmethod
+    def _text_hash(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", errors="surrogatepass"), digest_size=16).digest()
+
+    def _load_patch_text(self) -> str:
+        """Patch text from the side file; falls back to the value older versions kept in QSettings."""
+        path = self._patch_text_path()
+        try:
+            with open(path, "r", encoding="utf-8", errors="surrogatepass", newline="") as f:
+                text = f.read()
+        except FileNotFoundError:
+            # Migrated to the side file (and dropped from settings) on the next save
+            return self._settings.value("app/patchText", "", type=str)
+        except (OSError, ValueError) as e:
+            # ValueError: not UTF-8 (e.g. a hand-edited or truncated file)
+            log.warning("[SETTINGS] Could not read %s: %s", path, e)
+            return ""
+        self._patch_text_hash = self._text_hash(text)
+        return text
+
+    def _save_patch_text(self, text: str):
+        """Write the patch text to the side file atomically, skipping the write if it is unchanged."""
+        digest = self._text_hash(text)
+        if digest == self._patch_text_hash:
+            return
+        path = self._patch_text_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        f = QtCore.QSaveFile(str(path))
+        if not f.open(QtCore.QIODevice.WriteOnly):
+            log.warning("[SETTINGS] Could not write %s: %s", path, f.errorString())
+            return
+        f.write(QtCore.QByteArray(text.encode("utf-8", errors="surrogatepass")))
+        if not f.commit():
+            log.warning("[SETTINGS] Could not write %s: %s", path, f.errorString())
+            return
+        self._patch_text_hash = digest
+        self._settings.remove("app/patchText")
+
+    @QtCore.Slot()
+    def _mark_settings_dirty(self):
+        self._settings_dirty = True
+        if not self._settings_timer.isActive():
+            self._settings_timer.start()
+
+    @QtCore.Slot()
+    def _flush_settings(self):
+        if self._settings_dirty:
+            self._settings_dirty = False
+            self.save_settings()
 
     def closeEvent(self, event: QtGui.QCloseEvent):
         try:
             self.save_settings()
+            # The event loop is about to stop; don't rely on the deferred write
+            self._settings.sync()
         finally:
             super().closeEvent(event)
 
 
 def main():
+    logging.basicConfig(format="%(message)s")
     app = QtWidgets.QApplication(sys.argv)
     w = MainWindow()
     w.show()